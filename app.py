@@ -1,37 +1,57 @@
 from flask import Flask, request, jsonify, render_template
 import os
-import re
+import time
 from pathlib import Path
 
 # Keep these imports
-from utils.text_processing import extract_text, preprocess_text, rank_resume
-from utils.formatting import analyze_pdf_formatting
+from utils.pipeline import analyze_resume_file, SUPPORTED_SUFFIXES
 # REMOVE the grouping import (was used for content organization)
 # from utils.grouping import get_hybrid_grouping_analysis
-from utils.enhanced_grammar_and_paraphrasing import check_grammar_and_strength
+from utils.enhanced_grammar_and_paraphrasing import generate_scheduler
+from utils.models import encode_scheduler, SIMILARITY_POOLINGS
+from utils.admission import AdmissionController, remaining_seconds
+from utils.analysis_store import AnalysisStore
+from utils.pdf_sandbox import PdfParseError, PdfParserBusy
 
 app = Flask(__name__)
 UPLOAD_FOLDER = "uploaded_resumes"
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
+# Pooling for chunk-to-chunk resume/JD similarity: "max", "mean" or "topk"
+app.config["SIMILARITY_POOLING"] = os.environ.get("SIMILARITY_POOLING", "max")
+# Number of best resume chunks averaged per JD chunk with "topk" pooling
+app.config["SIMILARITY_TOP_K"] = int(os.environ.get("SIMILARITY_TOP_K", 3))
+if app.config["SIMILARITY_POOLING"] not in SIMILARITY_POOLINGS:
+    raise ValueError(
+        f"SIMILARITY_POOLING must be one of {', '.join(SIMILARITY_POOLINGS)}, "
+        f"got {app.config['SIMILARITY_POOLING']!r}"
+    )
+if app.config["SIMILARITY_TOP_K"] < 1:
+    raise ValueError("SIMILARITY_TOP_K must be at least 1")
+# Admission control and degrade tiers for /analyze_resume
+app.config["MAX_CONCURRENT_ANALYSES"] = int(os.environ.get("MAX_CONCURRENT_ANALYSES", 4))
+app.config["MAX_QUEUED_ANALYSES"] = int(os.environ.get("MAX_QUEUED_ANALYSES", 16))
+app.config["QUEUE_TIMEOUT_S"] = float(os.environ.get("QUEUE_TIMEOUT_S", 10))
+app.config["LATENCY_BUDGET_MS"] = int(os.environ.get("LATENCY_BUDGET_MS", 60000))
+app.config["WEAK_BULLET_LIMIT"] = int(os.environ.get("WEAK_BULLET_LIMIT", 3))
+# Analyses kept in memory for /reanalyze_resume
+app.config["MAX_STORED_ANALYSES"] = int(os.environ.get("MAX_STORED_ANALYSES", 256))
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-ACCOMPLISHMENT_KEYWORDS = r"\b(developed|implemented|created|improved|achieved|designed|optimized)\b"
-RESULT_KEYWORDS = r"\b(\d+%|\d+\s*(?:points|percent)|increased|decreased|improved|resulted|reduced)\b"
+admission = AdmissionController(
+    max_concurrent=app.config["MAX_CONCURRENT_ANALYSES"],
+    max_queue=app.config["MAX_QUEUED_ANALYSES"],
+    queue_timeout=app.config["QUEUE_TIMEOUT_S"]
+)
+analysis_store = AnalysisStore(max_entries=app.config["MAX_STORED_ANALYSES"])
 
 @app.route("/")
 def index():
     return render_template("index.html")
 
-def is_experience_bullet(text):
-    text_lower = text.lower()
-    return (re.search(ACCOMPLISHMENT_KEYWORDS, text_lower)
-            and re.search(RESULT_KEYWORDS, text_lower)
-            and len(text.split()) >= 5)
-
 @app.route("/analyze_resume", methods=["POST"])
 def analyze_resume():
     """
-    1) Extract bullet lines from PDF/DOCX
+    1) Extract bullet lines from the PDF
     2) Group them so we can do grammar checks
     3) Analyze for ATS rank, formatting, grammar, etc.
     4) Return JSON WITHOUT 'Content Organization' or 'grouping_issues'
@@ -45,105 +65,104 @@ def analyze_resume():
     if not job_desc:
         return jsonify({"error": "Job description required"}), 400
 
+    return admit_and_run(resume_file, job_desc)
+
+@app.route("/reanalyze_resume", methods=["POST"])
+def reanalyze_resume():
+    """
+    Re-analyzes an edited resume against a previous analysis (analysis_id).
+    Score and formatting are recomputed; bullets whose text is unchanged reuse
+    their earlier grammar and paraphrase results. job_description defaults
+    to the one used by the previous analysis.
+    """
+    if "resume" not in request.files:
+        return jsonify({"error": "No resume uploaded"}), 400
+
+    previous = analysis_store.get(request.form.get("analysis_id", ""))
+    if previous is None:
+        return jsonify({"error": "Unknown or expired analysis_id"}), 404
+
+    job_desc = request.form.get("job_description") or previous["job_description"]
+    return admit_and_run(request.files["resume"], job_desc, line_cache=previous["lines"])
+
+def admit_and_run(resume_file, job_desc, line_cache=None):
+    """
+    Applies admission control and the latency budget, then runs the analysis.
+    """
+    # Checked before saving or parsing anything
+    if Path(resume_file.filename or "").suffix.lower() not in SUPPORTED_SUFFIXES:
+        return jsonify({"error": "Only PDF resumes are supported"}), 415
+
+    # Per-request latency budget (capped at the server default); the clock
+    # starts before queueing so time spent waiting for a slot counts too
+    started = time.monotonic()
+    budget_ms = app.config["LATENCY_BUDGET_MS"]
+    try:
+        budget_ms = min(budget_ms, int(request.form.get("latency_budget_ms", budget_ms)))
+    except ValueError:
+        return jsonify({"error": "latency_budget_ms must be an integer"}), 400
+    if budget_ms < 0:
+        return jsonify({"error": "latency_budget_ms must not be negative"}), 400
+    deadline = started + budget_ms / 1000.0
+
+    if not admission.acquire():
+        return (
+            jsonify({"error": "Server is busy, please retry later"}),
+            429,
+            {"Retry-After": str(admission.retry_after())}
+        )
+    admitted = time.monotonic()
+    try:
+        return run_analysis(resume_file, job_desc, deadline, line_cache)
+    finally:
+        admission.release(time.monotonic() - admitted)
+
+def run_analysis(resume_file, job_desc, deadline, line_cache=None):
+    """
+    Runs the analysis pipeline for an admitted request; paraphrasing is
+    degraded according to load and the time left before deadline.
+    """
     # Save resume
     resume_path = Path(app.config["UPLOAD_FOLDER"]) / resume_file.filename
     resume_file.save(resume_path)
 
     try:
-        # Step 1: Extract bullet-based text
-        raw_text = extract_text(resume_path)
-
-        # Step 2: Group bullet lines into paragraphs for grammar context
-        grouped_lines = []
-        current_para = []
-        lines = raw_text.splitlines()
-
-        for line in lines:
-            stripped = line.strip()
-
-            # If blank line -> end current paragraph
-            if not stripped:
-                if current_para:
-                    grouped_lines.append(" ".join(current_para))
-                    current_para = []
-                continue
-
-            # If line starts with a bullet symbol
-            if stripped.startswith(("•", "-", "*")):
-                # close existing paragraph if any
-                if current_para:
-                    grouped_lines.append(" ".join(current_para))
-                    current_para = []
-                # start a new bullet paragraph
-                current_para.append(stripped)
-            else:
-                current_para.append(stripped)
-
-        if current_para:
-            grouped_lines.append(" ".join(current_para))
-
-        grouped_text = "\n\n".join(grouped_lines)
-        preprocessed_text = preprocess_text(grouped_text)
-
-        # Export debug
-        debug_path = Path(app.config["UPLOAD_FOLDER"]) / "grouped_output_debug.txt"
-        with open(debug_path, "w", encoding="utf-8") as f:
-            f.write(grouped_text)
-        print(f"[DEBUG] Grouped text written to {debug_path}")
-
-        # Step 3: Analyze
-        formatting_data = analyze_pdf_formatting(resume_path)
-        keyword_results = rank_resume(preprocessed_text, preprocess_text(job_desc))
-
-        # REMOVED: grouping_issues = get_hybrid_grouping_analysis(str(resume_path))[1]
-        # because we no longer want Content Organization logic
-
-        # Step 4: Grammar & bullet-based paraphrasing
-        bullet_lines = []
-        for para in grouped_lines:
-            if para and para[0] in ("•", "-", "*"):
-                bullet_text = para[1:].lstrip()
-                bullet_lines.append(bullet_text)
-
-        bullet_analysis = {}
-        try:
-            bullet_analysis = check_grammar_and_strength("\n".join(bullet_lines))
-        except Exception as e:
-            print(f"Error in grammar and strength analysis: {e}")
-            bullet_analysis = {"style_issues": [], "line_analysis": [], "metrics": {}}
-
-        # Step 5: Build final JSON (no grouping_issues)
-        return jsonify({
-            "score": keyword_results.get("score", 0),
-            "missing_keywords": keyword_results.get("missing_keywords", []),
-            "formatting_feedback": format_formatting_results(formatting_data),
-            # "grouping_issues": grouping_issues,  <-- REMOVED
-            "feedback": keyword_results.get("feedback", "No feedback available"),
-            "style_issues": bullet_analysis.get("style_issues", []),
-            "line_analysis": bullet_analysis.get("line_analysis", []),
-            "metrics": bullet_analysis.get("metrics", {})
-        })
-
-    except Exception as e:
-        return jsonify({"error": f"Analysis failed: {str(e)}"}), 500
-
-def format_formatting_results(formatting_data):
-    messages = []
-
-    if formatting_data.get("unique_font_names", 0) > 3:
-        messages.append(
-            f"Too many different fonts ({formatting_data['unique_font_names']}) - use 2-3 maximum."
+        result = analyze_resume_file(
+            resume_path,
+            job_desc,
+            pooling=app.config["SIMILARITY_POOLING"],
+            top_k=app.config["SIMILARITY_TOP_K"],
+            choose_tier=lambda: admission.choose_tier(remaining_seconds(deadline)),
+            weak_limit=app.config["WEAK_BULLET_LIMIT"],
+            deadline=deadline,
+            debug_path=Path(app.config["UPLOAD_FOLDER"]) / "grouped_output_debug.txt",
+            line_cache=line_cache
         )
-    if formatting_data.get("bullet_percentage", 0) < 30:
-        messages.append(
-            f"Low bullet usage ({formatting_data['bullet_percentage']}%) - Increase to ~40% or more for clarity."
+        result["analysis_id"] = analysis_store.save(job_desc, result["line_analysis"])
+        return jsonify(result)
+
+    except PdfParserBusy as e:
+        return (
+            jsonify({"error": f"Server is busy, please retry later ({str(e)})"}),
+            429,
+            {"Retry-After": str(admission.retry_after())}
         )
+    except PdfParseError as e:
+        return jsonify({"error": f"Could not read resume: {str(e)}"}), 422
+    except Exception as e:
+        return jsonify({"error": f"Analysis failed: {str(e)}"}), 500
 
-    bullet_consistency_msg = formatting_data.get("bullet_font_consistency")
-    if bullet_consistency_msg:
-        messages.append(f"[Bullet Font Check] {bullet_consistency_msg}")
-
-    return messages
+@app.route("/inference_metrics")
+def inference_metrics():
+    """
+    Queue depth and batch sizes of the shared model schedulers, plus
+    the /analyze_resume admission queue.
+    """
+    return jsonify({
+        "bert": encode_scheduler.metrics(),
+        "flan": generate_scheduler.metrics(),
+        "admission": admission.metrics()
+    })
 
 if __name__ == "__main__":
     print("Loading ML models...")
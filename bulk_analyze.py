@@ -0,0 +1,243 @@
+"""
+Offline bulk analysis: runs the /analyze_resume pipeline over every resume
+in a folder against one or more job descriptions.
+
+    python bulk_analyze.py uploaded_resumes --job jobs/backend.txt --job jobs/ml.txt
+
+Results stream to a JSONL file, one line per (resume, job) pair. Re-running
+with the same output file skips pairs that already succeeded, so an
+interrupted run picks up where it stopped.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from utils.admission import DEGRADE_TIERS
+
+# Same as utils.pipeline.SUPPORTED_SUFFIXES, which can't be imported here
+# without loading the models into the parent process
+SUPPORTED_SUFFIXES = (".pdf",)
+
+# Set in each worker process by _init_worker so models load once per worker
+_pipeline = None
+
+def _init_worker(torch_threads):
+    global _pipeline
+    import torch
+    torch.set_num_threads(torch_threads)
+
+    from utils import pipeline
+    _pipeline = pipeline
+
+def _analyze_pair(resume_path, job_id, job_desc, tier, pooling, top_k):
+    started = time.monotonic()
+    record = {"resume": resume_path, "job": job_id}
+    try:
+        record["result"] = _pipeline.analyze_resume_file(
+            resume_path, job_desc, pooling=pooling, top_k=top_k, choose_tier=lambda: tier
+        )
+        record["status"] = "ok"
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = str(e)
+    record["seconds"] = round(time.monotonic() - started, 2)
+    return record
+
+def _error_record(resume_path, job_id, error):
+    return {"resume": resume_path, "job": job_id, "status": "error", "error": error, "seconds": None}
+
+def pair_key(resume, job):
+    # Resolved so re-runs from another directory or with an absolute path match
+    return f"{Path(resume).resolve()}::{job}"
+
+def load_checkpoint(output_path):
+    """
+    Returns the keys of pairs that already succeeded in output_path. A
+    truncated last line (from a killed run) is ignored.
+    """
+    done = set()
+    if not output_path.exists():
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") == "ok":
+                done.add(pair_key(record["resume"], record["job"]))
+    return done
+
+def load_jobs(job_paths):
+    """
+    Maps job ids to job description text. The id is the resolved path plus
+    a hash of the text, so editing a job file re-runs its pairs instead of
+    matching the old checkpoint records.
+    """
+    jobs = {}
+    for path in map(Path, job_paths):
+        text = path.read_text(encoding="utf-8")
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+        jobs[f"{path.resolve()}#{digest}"] = text
+    return jobs
+
+def job_label(job_id):
+    # "backend.txt" for progress output instead of the full id
+    return Path(job_id.rsplit("#", 1)[0]).name
+
+def _make_executor(workers, torch_threads):
+    # spawn, not fork: workers must not inherit torch/JVM state from the parent
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(torch_threads,)
+    )
+
+def format_eta(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze a folder of resumes against job descriptions.")
+    parser.add_argument("resume_dir", help="Folder of resumes (e.g. uploaded_resumes/)")
+    parser.add_argument("--job", action="append", required=True,
+                        help="Job description text file; repeat for several jobs")
+    parser.add_argument("--output", default="bulk_results.jsonl", help="JSONL output / checkpoint file")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Worker processes (each loads its own copy of the models)")
+    parser.add_argument("--tier", default="full", choices=DEGRADE_TIERS,
+                        help="Paraphrasing tier, see utils/admission.py")
+    parser.add_argument("--pooling", default="max", choices=("max", "mean", "topk"),
+                        help="Chunk similarity pooling")
+    parser.add_argument("--top-k", type=int, default=3,
+                        help="Resume chunks averaged per job chunk with --pooling topk")
+    args = parser.parse_args(argv)
+    if args.top_k < 1:
+        parser.error("--top-k must be at least 1")
+
+    resume_dir = Path(args.resume_dir)
+    resumes = sorted(
+        str(path.resolve()) for path in resume_dir.iterdir()
+        if path.suffix.lower() in SUPPORTED_SUFFIXES
+    )
+    jobs = load_jobs(args.job)
+
+    output_path = Path(args.output)
+    done = load_checkpoint(output_path)
+    pending = [
+        (resume, job_id) for resume in resumes for job_id in jobs
+        if pair_key(resume, job_id) not in done
+    ]
+    total = len(resumes) * len(jobs)
+    print(f"{len(resumes)} resumes x {len(jobs)} jobs: {total - len(pending)} done, {len(pending)} to go")
+    if not pending:
+        return 0
+
+    # Make sure new records start on a fresh line after a truncated write
+    if output_path.exists() and output_path.stat().st_size:
+        with open(output_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+    else:
+        needs_newline = False
+
+    torch_threads = max(1, (os.cpu_count() or 1) // args.workers)
+    started = time.monotonic()
+    finished = failed = 0
+
+    def submit(executor, pair):
+        resume, job_id = pair
+        return executor.submit(
+            _analyze_pair, resume, job_id, jobs[job_id], args.tier, args.pooling, args.top_k
+        )
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        if needs_newline:
+            out.write("\n")
+
+        def finish(record):
+            nonlocal finished, failed
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+
+            finished += 1
+            if record["status"] != "ok":
+                failed += 1
+            elapsed = time.monotonic() - started
+            rate = finished / elapsed if elapsed else 0.0
+            eta = (len(pending) - finished) / rate if rate else 0.0
+            seconds = record["seconds"] if record["seconds"] is not None else "-"
+            print(
+                f"[{finished}/{len(pending)}] {rate:.2f} docs/s, ETA {format_eta(eta)} - "
+                f"{Path(record['resume']).name} x {job_label(record['job'])}: {record['status']} ({seconds}s)"
+            )
+
+        # At most one pair per worker is in flight, so a worker crash (OOM kill,
+        # native crash) only takes down the pairs that were actually running.
+        # Those are re-run one at a time to find the one that kills its worker.
+        queue = deque(pending)
+        suspects = deque()
+        in_flight = {}
+        executor = None
+        try:
+            while queue or suspects or in_flight:
+                if executor is None:
+                    executor = _make_executor(args.workers, torch_threads)
+                if suspects:
+                    if not in_flight:
+                        pair = suspects.popleft()
+                        in_flight[submit(executor, pair)] = pair
+                else:
+                    while queue and len(in_flight) < args.workers:
+                        pair = queue.popleft()
+                        in_flight[submit(executor, pair)] = pair
+
+                done_futures, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                if any(isinstance(f.exception(), BrokenProcessPool) for f in done_futures):
+                    # Every pair still in flight fails with the pool
+                    wait(in_flight)
+                    done_futures = set(in_flight)
+                    crashed_alone = len(in_flight) == 1
+                    executor.shutdown(wait=False)
+                    executor = None
+                else:
+                    crashed_alone = False
+
+                for future in done_futures:
+                    resume, job_id = in_flight.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        finish(future.result())
+                    elif isinstance(error, BrokenProcessPool) and not crashed_alone:
+                        suspects.append((resume, job_id))
+                    elif isinstance(error, BrokenProcessPool):
+                        finish(_error_record(resume, job_id, f"Worker process died: {error}"))
+                    else:
+                        finish(_error_record(resume, job_id, str(error)))
+
+                if executor is None and (queue or suspects):
+                    print(f"Worker pool crashed; restarting it ({len(suspects)} pairs to re-check alone)")
+        except KeyboardInterrupt:
+            print("Interrupted; completed results are saved, re-run to resume.")
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+            return 130
+        if executor is not None:
+            executor.shutdown()
+
+    print(f"Finished {finished} pairs ({failed} failed) in {format_eta(time.monotonic() - started)}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
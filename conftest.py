@@ -0,0 +1 @@
+# Makes the repo root importable (utils.*) when running pytest.
@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+
+from utils.admission import AdmissionController, tier_options
+
+
+def test_idle_server_admits_with_no_queue():
+    admission = AdmissionController(max_concurrent=2, max_queue=0, queue_timeout=0.1)
+    assert admission.acquire()
+    assert admission.acquire()
+    assert not admission.acquire()
+    assert admission.metrics()["rejected"] == 1
+
+
+def test_full_queue_rejects_immediately():
+    admission = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=5)
+    assert admission.acquire()
+
+    waiter = threading.Thread(target=admission.acquire)
+    waiter.start()
+    while admission.metrics()["waiting"] == 0:
+        time.sleep(0.01)
+
+    started = time.monotonic()
+    assert not admission.acquire()
+    assert time.monotonic() - started < 1
+
+    admission.release()
+    waiter.join(timeout=5)
+    assert admission.metrics() == {
+        "active": 1, "waiting": 0, "rejected": 1, "max_concurrent": 1, "max_queue": 1
+    }
+
+
+def test_queue_timeout():
+    admission = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=0.1)
+    assert admission.acquire()
+    assert not admission.acquire()
+    metrics = admission.metrics()
+    assert metrics["waiting"] == 0
+    assert metrics["rejected"] == 1
+
+
+def test_release_frees_a_slot():
+    admission = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=0.1)
+    assert admission.acquire()
+    admission.release(duration=2.0)
+    assert admission.acquire()
+    assert admission.retry_after() == 2
+
+
+@pytest.mark.parametrize("active, budget, tier", [
+    (1, 60, "full"),
+    (1, 10, "greedy"),
+    (1, 5, "weakest_only"),
+    (1, 1, "no_paraphrase"),
+    (3, 60, "full"),           # two other requests, load 0.5
+    (4, 60, "greedy"),
+    (5, 60, "greedy"),         # four others, load 1.0
+    (9, 60, "weakest_only"),
+    (10, 60, "no_paraphrase"),
+])
+def test_choose_tier(active, budget, tier):
+    admission = AdmissionController(max_concurrent=4)
+    admission.active = active
+    assert admission.choose_tier(budget) == tier
+
+
+def test_waiting_requests_count_as_load():
+    admission = AdmissionController(max_concurrent=4)
+    admission.active = 1
+    admission.waiting = 3
+    assert admission.choose_tier(60) == "greedy"
+
+
+def test_tier_options():
+    assert tier_options("full") == {"num_beams": 5}
+    assert tier_options("greedy") == {"num_beams": 1}
+    assert tier_options("no_paraphrase") == {"paraphrase_limit": 0}
+
+    options = tier_options("weakest_only", weak_lines=[" weak bullet "])
+    assert options["num_beams"] == 1
+    assert options["paraphrase_filter"]("weak bullet")
+    assert not options["paraphrase_filter"]("strong bullet")
+
+    with pytest.raises(ValueError):
+        tier_options("turbo")
@@ -0,0 +1,92 @@
+import threading
+
+import pytest
+
+from utils.batching import BatchScheduler
+
+
+def upper_batch(sizes):
+    def batch_fn(payloads):
+        sizes.append(len(payloads))
+        return [payload.upper() for payload in payloads]
+    return batch_fn
+
+
+def test_batches_calls_from_many_threads():
+    sizes = []
+    scheduler = BatchScheduler(upper_batch(sizes), max_batch_size=32, max_wait_ms=100)
+    barrier = threading.Barrier(8)
+    results = {}
+
+    def caller(i):
+        barrier.wait()
+        results[i] = scheduler.submit(f"item{i}").result(timeout=5)
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {i: f"ITEM{i}" for i in range(8)}
+    assert max(sizes) > 1
+    assert sum(sizes) == 8
+
+
+def test_results_follow_submission_order():
+    scheduler = BatchScheduler(upper_batch([]), max_wait_ms=20)
+    payloads = [f"p{i}" for i in range(50)]
+    assert scheduler.run(payloads) == [payload.upper() for payload in payloads]
+
+
+def test_respects_max_batch_size():
+    sizes = []
+    scheduler = BatchScheduler(upper_batch(sizes), max_batch_size=4, max_wait_ms=50)
+    scheduler.run([str(i) for i in range(10)])
+    assert max(sizes) <= 4
+
+
+def test_bad_payload_only_fails_its_own_caller():
+    def batch_fn(payloads):
+        if "bad" in payloads:
+            raise ValueError("bad payload")
+        return [payload.upper() for payload in payloads]
+
+    scheduler = BatchScheduler(batch_fn, max_wait_ms=50)
+    futures = {payload: scheduler.submit(payload) for payload in ("a", "bad", "c")}
+
+    assert futures["a"].result(timeout=5) == "A"
+    assert futures["c"].result(timeout=5) == "C"
+    with pytest.raises(ValueError):
+        futures["bad"].result(timeout=5)
+
+
+def test_short_result_is_retried_per_item():
+    # Returns only the first result: wrong length for batches, fine for one item
+    scheduler = BatchScheduler(lambda payloads: [payloads[0]], max_wait_ms=50)
+    futures = [scheduler.submit(payload) for payload in ("a", "b", "c")]
+    assert [future.result(timeout=5) for future in futures] == ["a", "b", "c"]
+
+
+def test_missing_results_never_hang_callers():
+    scheduler = BatchScheduler(lambda payloads: [], max_wait_ms=50)
+    futures = [scheduler.submit(payload) for payload in ("a", "b")]
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=5)
+
+
+def test_metrics():
+    sizes = []
+    scheduler = BatchScheduler(upper_batch(sizes), max_batch_size=3, max_wait_ms=50)
+    assert scheduler.metrics() == {
+        "queue_depth": 0, "batches": 0, "items": 0, "avg_batch_size": 0, "max_batch_size": 0
+    }
+
+    scheduler.run(["a", "b", "c", "d"])
+    metrics = scheduler.metrics()
+    assert metrics["queue_depth"] == 0
+    assert metrics["items"] == 4
+    assert metrics["batches"] == len(sizes)
+    assert metrics["max_batch_size"] == max(sizes) <= 3
+    assert metrics["avg_batch_size"] == round(4 / len(sizes), 2)
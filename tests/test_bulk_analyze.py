@@ -0,0 +1,37 @@
+import json
+
+from bulk_analyze import job_label, load_checkpoint, load_jobs, pair_key
+
+
+def test_job_ids_change_with_job_text(tmp_path):
+    job = tmp_path / "backend.txt"
+    job.write_text("Python, Flask", encoding="utf-8")
+    (job_id,) = load_jobs([str(job)])
+
+    job.write_text("Go, Kubernetes", encoding="utf-8")
+    (edited_id,) = load_jobs([str(job)])
+
+    assert job_id != edited_id
+    assert job_label(job_id) == "backend.txt"
+
+
+def test_same_stem_in_different_folders(tmp_path):
+    for folder in ("a", "b"):
+        (tmp_path / folder).mkdir()
+        (tmp_path / folder / "job.txt").write_text("same text", encoding="utf-8")
+    jobs = load_jobs([str(tmp_path / "a" / "job.txt"), str(tmp_path / "b" / "job.txt")])
+    assert len(jobs) == 2
+
+
+def test_checkpoint_skips_only_successful_pairs(tmp_path):
+    job = tmp_path / "job.txt"
+    job.write_text("Python", encoding="utf-8")
+    (job_id,) = load_jobs([str(job)])
+
+    output = tmp_path / "results.jsonl"
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"resume": "ok.pdf", "job": job_id, "status": "ok"}) + "\n")
+        f.write(json.dumps({"resume": "bad.pdf", "job": job_id, "status": "error"}) + "\n")
+        f.write('{"resume": "cut.pdf", "jo')
+
+    assert load_checkpoint(output) == {pair_key("ok.pdf", job_id)}
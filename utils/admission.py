@@ -0,0 +1,142 @@
+import math
+import threading
+import time
+
+# Paraphrasing tiers, cheapest last. Each request starts from the tier its
+# share of server load allows and drops further if its latency budget is short.
+DEGRADE_TIERS = ("full", "greedy", "weakest_only", "no_paraphrase")
+
+# Remaining budget (seconds) a request needs to stay on a tier
+TIER_MIN_BUDGET = {
+    "full": 20.0,
+    "greedy": 8.0,
+    "weakest_only": 3.0,
+    "no_paraphrase": 0.0,
+}
+
+# Load from *other* requests ((active - 1 + waiting) / max_concurrent, the
+# caller's own slot excluded) at or below which a tier is still allowed
+TIER_MAX_LOAD = {
+    "full": 0.5,
+    "greedy": 1.0,
+    "weakest_only": 2.0,
+    "no_paraphrase": math.inf,
+}
+
+
+class AdmissionController:
+    """
+    Server-wide concurrency limiter for expensive analyses.
+
+    At most max_concurrent requests run at once; up to max_queue more wait
+    (for at most queue_timeout seconds) for a slot. Anything beyond that is
+    rejected so the caller can answer 429 with retry_after().
+    """
+
+    def __init__(self, max_concurrent=4, max_queue=16, queue_timeout=10.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._avg_duration = None
+
+    def acquire(self):
+        """
+        Blocks until a slot is free. Returns False if the queue is full or
+        the wait timed out.
+        """
+        # A free slot is taken straight away; only requests that would have
+        # to wait count against max_queue
+        with self._lock:
+            if self._slots.acquire(blocking=False):
+                self.active += 1
+                return True
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                return False
+            self.waiting += 1
+
+        acquired = self._slots.acquire(timeout=self.queue_timeout)
+
+        with self._lock:
+            self.waiting -= 1
+            if acquired:
+                self.active += 1
+            else:
+                self.rejected += 1
+        return acquired
+
+    def release(self, duration=None):
+        with self._lock:
+            self.active -= 1
+            if duration is not None:
+                # Exponential moving average, used for Retry-After estimates
+                if self._avg_duration is None:
+                    self._avg_duration = duration
+                else:
+                    self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+        self._slots.release()
+
+    def load(self):
+        """
+        Load from other requests, as a fraction of max_concurrent. Called by
+        an admitted request, so its own slot is not counted.
+        """
+        with self._lock:
+            return max(0, self.active - 1 + self.waiting) / self.max_concurrent
+
+    def retry_after(self):
+        """
+        Seconds until a retry is likely to be admitted.
+        """
+        with self._lock:
+            avg = self._avg_duration or self.queue_timeout
+            backlog = (self.active + self.waiting) / self.max_concurrent
+        return max(1, math.ceil(avg * backlog))
+
+    def choose_tier(self, remaining_budget):
+        """
+        Picks the most expensive tier allowed by both the current load and
+        the request's remaining latency budget (in seconds).
+        """
+        load = self.load()
+        for tier in DEGRADE_TIERS:
+            if load <= TIER_MAX_LOAD[tier] and remaining_budget >= TIER_MIN_BUDGET[tier]:
+                return tier
+        return DEGRADE_TIERS[-1]
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "active": self.active,
+                "waiting": self.waiting,
+                "rejected": self.rejected,
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+            }
+
+
+def tier_options(tier, weak_lines=()):
+    """
+    Keyword arguments for check_grammar_and_strength on the given tier.
+    weak_lines are the bullets to paraphrase on the "weakest_only" tier.
+    """
+    if tier == "full":
+        return {"num_beams": 5}
+    if tier == "greedy":
+        return {"num_beams": 1}
+    if tier == "weakest_only":
+        weak_lines = {line.strip() for line in weak_lines}
+        return {"num_beams": 1, "paraphrase_filter": weak_lines.__contains__}
+    if tier == "no_paraphrase":
+        return {"paraphrase_limit": 0}
+    raise ValueError(f"Unknown degrade tier: {tier}")
+
+
+def remaining_seconds(deadline):
+    return deadline - time.monotonic()
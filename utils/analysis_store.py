@@ -0,0 +1,37 @@
+import threading
+import uuid
+from collections import OrderedDict
+
+
+class AnalysisStore:
+    """
+    In-memory store of recent analyses for incremental re-analysis.
+
+    Each record keeps the job description and the per-bullet line_analysis
+    entries keyed by their fingerprint. The oldest records are evicted once
+    max_entries is reached.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._records = OrderedDict()
+        self._lock = threading.Lock()
+
+    def save(self, job_desc, line_analysis):
+        analysis_id = uuid.uuid4().hex
+        record = {
+            "job_description": job_desc,
+            "lines": {entry["fingerprint"]: entry for entry in line_analysis},
+        }
+        with self._lock:
+            self._records[analysis_id] = record
+            while len(self._records) > self.max_entries:
+                self._records.popitem(last=False)
+        return analysis_id
+
+    def get(self, analysis_id):
+        with self._lock:
+            record = self._records.get(analysis_id)
+            if record is not None:
+                self._records.move_to_end(analysis_id)
+            return record
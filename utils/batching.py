@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+
+class BatchScheduler:
+    """
+    Gathers single-item inference calls from any request thread into batches.
+
+    Items queue up for at most max_wait_ms (or until max_batch_size items are
+    waiting), then one background thread runs batch_fn on the whole list and
+    hands each result back to its caller through a Future. batch_fn must take
+    a list of payloads and return a list of results in the same order.
+    If a batch fails, its items are retried one by one so a bad payload
+    only fails its own caller.
+
+    Running every batch on the one scheduler thread also means torch threads
+    from different requests no longer compete with each other.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=32, max_wait_ms=5, name="batch"):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+
+        self._batches = 0
+        self._items = 0
+        self._max_batch = 0
+
+    def submit(self, payload):
+        future = Future()
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=f"{self.name}-scheduler", daemon=True
+                )
+                self._thread.start()
+            self._queue.append((payload, future))
+            self._cond.notify()
+        return future
+
+    def run(self, payloads):
+        """
+        Submits every payload and blocks until all results are back.
+        """
+        futures = [self.submit(payload) for payload in payloads]
+        return [future.result() for future in futures]
+
+    def metrics(self):
+        with self._cond:
+            return {
+                "queue_depth": len(self._queue),
+                "batches": self._batches,
+                "items": self._items,
+                "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0,
+                "max_batch_size": self._max_batch,
+            }
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+
+            # Hold the first item for up to max_wait so concurrent callers can join it
+            deadline = time.monotonic() + self.max_wait
+            while len(self._queue) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            size = min(len(self._queue), self.max_batch_size)
+            batch = [self._queue.popleft() for _ in range(size)]
+
+            self._batches += 1
+            self._items += size
+            self._max_batch = max(self._max_batch, size)
+            return batch
+
+    def _run_batch(self, batch):
+        payloads = [payload for payload, _ in batch]
+        results = self.batch_fn(payloads)
+        if len(results) != len(payloads):
+            raise RuntimeError(
+                f"{self.name} batch returned {len(results)} results for {len(payloads)} payloads"
+            )
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._run_batch(batch)
+            except Exception as e:
+                print(f"[{self.name} Batch Error] {e}")
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                else:
+                    # Retry one at a time so only the bad payload fails
+                    for item in batch:
+                        try:
+                            self._run_batch([item])
+                        except Exception as item_error:
+                            if not item[1].done():
+                                item[1].set_exception(item_error)
+            finally:
+                # Never leave a caller blocked in .result()
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(
+                            RuntimeError(f"{self.name} batch finished without a result")
+                        )
@@ -2,6 +2,11 @@ import language_tool_python
 import spacy
 from transformers import T5ForConditionalGeneration, T5Tokenizer
 import difflib  # for highlight_changes
+import hashlib
+import re
+import time
+from concurrent.futures import TimeoutError as FuturesTimeout
+from .batching import BatchScheduler
 
 nlp = spacy.load("en_core_web_sm")
 tool = language_tool_python.LanguageTool('en-US')
@@ -9,6 +14,41 @@ tool = language_tool_python.LanguageTool('en-US')
 tokenizer = T5Tokenizer.from_pretrained("google/flan-t5-base", legacy=False)
 model = T5ForConditionalGeneration.from_pretrained("google/flan-t5-base")
 
+def _generate_batch(payloads):
+    """
+    payloads are (prompt, generation kwargs) pairs. Prompts that share the same
+    kwargs are padded into one model.generate call; each payload gets back the
+    list of its decoded candidates.
+    """
+    results = [None] * len(payloads)
+    groups = {}
+    for i, (_, gen_kwargs) in enumerate(payloads):
+        groups.setdefault(tuple(sorted(gen_kwargs.items())), []).append(i)
+
+    for key, indices in groups.items():
+        gen_kwargs = dict(key)
+        inputs = tokenizer(
+            [payloads[i][0] for i in indices],
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=256
+        )
+        outputs = model.generate(
+            inputs.input_ids,
+            attention_mask=inputs.attention_mask,
+            **gen_kwargs
+        )
+        per_input = gen_kwargs.get("num_return_sequences", 1)
+        for pos, i in enumerate(indices):
+            results[i] = [
+                tokenizer.decode(output, skip_special_tokens=True).strip()
+                for output in outputs[pos * per_input:(pos + 1) * per_input]
+            ]
+    return results
+
+generate_scheduler = BatchScheduler(_generate_batch, max_batch_size=8, max_wait_ms=10, name="flan")
+
 def highlight_changes(original, improved):
     if not improved:
         return None
@@ -29,31 +69,32 @@ def highlight_changes(original, improved):
 
     return ' '.join(highlighted_tokens)
 
-def paraphrase_with_flan(text):
+def submit_paraphrase(text, num_beams=5):
+    """
+    Queues text on the flan scheduler and returns a Future of its decoded
+    candidates; pass them to pick_paraphrase.
+    """
     prompt = (
         "Rewrite this bullet point with correct grammar, using an action verb, "
         "the skill/technology used, and a measurable outcome if possible. "
         "Keep it concise:\n\n" + text
     )
 
-    inputs = tokenizer(
-        prompt,
-        return_tensors="pt",
-        padding=True,
-        truncation=True,
-        max_length=256
-    )
-
-    outputs = model.generate(
-        inputs.input_ids,
-        max_length=256,
-        num_beams=5,
-        num_return_sequences=3,
-        early_stopping=True
-    )
-
-    for i in range(3):
-        decoded = tokenizer.decode(outputs[i], skip_special_tokens=True).strip()
+    if num_beams > 1:
+        gen_kwargs = {
+            "max_length": 256,
+            "num_beams": num_beams,
+            "num_return_sequences": min(3, num_beams),
+            "early_stopping": True
+        }
+    else:
+        # Greedy decoding: a single candidate, much cheaper than beam search
+        gen_kwargs = {"max_length": 256, "num_beams": 1}
+
+    return generate_scheduler.submit((prompt, gen_kwargs))
+
+def pick_paraphrase(text, candidates):
+    for decoded in candidates:
         if (
             decoded
             and decoded.lower() != text.lower()
@@ -62,12 +103,38 @@ def paraphrase_with_flan(text):
             return decoded
     return None
 
-def check_grammar_and_strength(text_block):
+def paraphrase_with_flan(text, num_beams=5):
+    return pick_paraphrase(text, submit_paraphrase(text, num_beams).result())
+
+def line_fingerprint(line):
+    """
+    Stable key for a bullet line; whitespace-only changes don't count as edits.
+    """
+    normalized = re.sub(r"\s+", " ", line).strip()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+def check_grammar_and_strength(text_block, num_beams=5, paraphrase_filter=None,
+                               paraphrase_limit=None, deadline=None, line_cache=None):
+    """
+    Grammar-checks and paraphrases each line of text_block.
+
+    Paraphrasing can be narrowed for degraded service: only lines passing
+    paraphrase_filter are paraphrased, at most paraphrase_limit of them, and
+    none once time.monotonic() passes deadline. Skipped lines keep their
+    grammar results with paraphrased=None.
+
+    line_cache maps line_fingerprint() to a line_analysis entry from an earlier
+    run; matching lines reuse it instead of re-running grammar and paraphrase,
+    unless it was paraphrased with fewer beams (paraphrase_beams) than this
+    call would use.
+    """
     doc = nlp(text_block)
     style_issues = []
-    metrics = {"first_person": 0, "passive_voice": 0, "content_density": 0}
+    metrics = {"first_person": 0, "passive_voice": 0, "content_density": 0,
+               "paraphrased_lines": 0, "paraphrase_skipped": 0, "reused_lines": 0}
     lines = [line.strip() for line in text_block.split("\n") if line.strip()]
     line_analysis = []
+    pending = []
 
     for idx, line in enumerate(lines, start=1):
         if len(line.split()) < 5:
@@ -78,29 +145,81 @@ def check_grammar_and_strength(text_block):
         if ("was" in line or "were" in line) and "by" in line:
             metrics["passive_voice"] += 1
 
+        skipped = (
+            (paraphrase_filter is not None and not paraphrase_filter(line))
+            or (paraphrase_limit is not None and metrics["paraphrased_lines"] >= paraphrase_limit)
+            or (deadline is not None and time.monotonic() >= deadline)
+        )
+
+        fingerprint = line_fingerprint(line)
+        cached = (line_cache or {}).get(fingerprint)
+        # Reused only if its paraphrase is at least as good as this request's
+        # tier would produce (0 beams = not paraphrased); failures are retried
+        required_beams = 0 if skipped else num_beams
+        if (
+            cached is not None
+            and not cached.get("paraphrase_failed")
+            and cached.get("paraphrase_beams", 0) >= required_beams
+        ):
+            metrics["reused_lines"] += 1
+            line_analysis.append(dict(cached, line_number=idx, text=line))
+            continue
+
+        future = None
+        failed = False
+        if skipped:
+            metrics["paraphrase_skipped"] += 1
+        else:
+            # Submitted now and collected below, so this request's bullets
+            # batch together while LanguageTool checks the rest
+            metrics["paraphrased_lines"] += 1
+            try:
+                future = submit_paraphrase(line, num_beams=num_beams)
+            except Exception as e:
+                print(f"[Paraphrasing Error] Line {idx}: {e}")
+                failed = True
+
         grammar_matches = tool.check(line)
         grammar_errors = [
             {"message": match.message, "rule": match.ruleId}
             for match in grammar_matches
         ]
 
+        entry = {
+            "line_number": idx,
+            "text": line,
+            "fingerprint": fingerprint,
+            "grammar_errors": grammar_errors,
+            "paraphrased": None,
+            "diff_html": None,
+            "paraphrase_skipped": skipped,
+            "paraphrase_failed": failed,
+            "paraphrase_beams": 0 if skipped or failed else num_beams
+        }
+        line_analysis.append(entry)
+        if future is not None:
+            pending.append((entry, future))
+
+    for entry, future in pending:
         try:
-            improved = paraphrase_with_flan(line)
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            improved = pick_paraphrase(entry["text"], future.result(timeout=timeout))
+        except FuturesTimeout:
+            # Out of budget: leave this line unparaphrased
+            metrics["paraphrased_lines"] -= 1
+            metrics["paraphrase_skipped"] += 1
+            entry["paraphrase_skipped"] = True
+            entry["paraphrase_beams"] = 0
+            continue
         except Exception as e:
-            print(f"[Paraphrasing Error] Line {idx}: {e}")
-            improved = None
+            print(f"[Paraphrasing Error] Line {entry['line_number']}: {e}")
+            entry["paraphrase_failed"] = True
+            entry["paraphrase_beams"] = 0
+            continue
 
-        diff_html = None
+        entry["paraphrased"] = improved
         if improved:
-            diff_html = highlight_changes(line, improved)
-
-        line_analysis.append({
-            "line_number": idx,
-            "text": line,
-            "grammar_errors": grammar_errors,
-            "paraphrased": improved,
-            "diff_html": diff_html
-        })
+            entry["diff_html"] = highlight_changes(entry["text"], improved)
 
     if metrics["first_person"] > 0:
         style_issues.append(f"Avoid first-person pronouns (found {metrics['first_person']})")
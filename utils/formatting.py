@@ -1,6 +1,5 @@
 import pdfplumber
 import re
-from .models import bert_model  # not actively used, but kept for consistency
 
 def normalize_font_name(font_name):
     """
@@ -13,7 +12,19 @@ def normalize_font_name(font_name):
     normalized = normalized.replace('-', '').replace('_', '')
     return normalized.strip().lower()
 
-def analyze_pdf_formatting(pdf_path):
+def sample_pages(pages, max_pages):
+    """
+    Returns at most max_pages pages, evenly spread over the document
+    (always including the first and last page).
+    """
+    if max_pages is None or len(pages) <= max_pages:
+        return list(pages)
+    if max_pages <= 1:
+        return [pages[0]]
+    step = (len(pages) - 1) / (max_pages - 1)
+    return [pages[round(i * step)] for i in range(max_pages)]
+
+def analyze_pdf_formatting(pdf_path, max_pages=None, max_chars_per_page=None):
     """
     Analyzes a PDF resume for:
      - overall font consistency
@@ -21,6 +32,10 @@ def analyze_pdf_formatting(pdf_path):
      - bullet line font/style consistency (NEW)
      - etc.
 
+    Long documents are sampled down to max_pages pages, and the per-character
+    font checks are skipped on pages with more than max_chars_per_page chars
+    (vector-heavy pages can have huge page.chars lists).
+
     Returns a dictionary with overall formatting statistics, plus bullet font consistency feedback
     in "bullet_font_consistency".
     """
@@ -32,10 +47,16 @@ def analyze_pdf_formatting(pdf_path):
     bullet_fonts = []
     bullet_sizes = []
 
+    pages_total = 0
+    pages_analyzed = 0
+
     with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
+        pages_total = len(pdf.pages)
+        for page in sample_pages(pdf.pages, max_pages):
+            pages_analyzed += 1
             text = page.extract_text()
             if not text:
+                page.close()
                 continue
 
             # Count lines for bullet percentage
@@ -48,6 +69,10 @@ def analyze_pdf_formatting(pdf_path):
                 if line_stripped.startswith(("•", "-", "*")):
                     bullet_count += 1
 
+            if max_chars_per_page is not None and len(page.chars) > max_chars_per_page:
+                page.close()
+                continue
+
             # We also gather all per-character info to detect bullet line font usage
             chars = sorted(page.chars, key=lambda c: float(c['top']))
 
@@ -90,6 +115,8 @@ def analyze_pdf_formatting(pdf_path):
                 size = round(char.get("size", 0), 1)
                 font_usage.add((normalized_font, size))
 
+            page.close()  # drop pdfplumber's per-page object cache
+
     unique_font_names = len({f[0] for f in font_usage})
     unique_font_sizes = len({f[1] for f in font_usage})
     bullet_percentage = (bullet_count / total_lines) * 100 if total_lines else 0
@@ -105,7 +132,9 @@ def analyze_pdf_formatting(pdf_path):
         "unique_font_names": unique_font_names,
         "unique_font_sizes": unique_font_sizes,
         "all_fonts_and_sizes": list(font_usage),
-        "bullet_font_consistency": bullet_font_consistency_msg  # NEW
+        "bullet_font_consistency": bullet_font_consistency_msg,  # NEW
+        "pages_total": pages_total,
+        "pages_analyzed": pages_analyzed
     }
 
 def check_bullet_font_consistency(bullet_fonts, bullet_sizes):
@@ -4,7 +4,7 @@ import spacy
 from spacy.matcher import PhraseMatcher
 from skillNer.general_params import SKILL_DB
 from skillNer.skill_extractor_class import SkillExtractor
-from .models import bert_model  # Ensure bert_model is properly loaded
+from .models import encode_texts  # Batched through the shared BERT scheduler
 import nltk
 from nltk.corpus import stopwords
 
@@ -30,10 +30,11 @@ GENERIC_WORDS = load_generic_words()
 
 def filter_generic_keywords(keywords, generic_words, threshold=0.6):
     filtered_keywords = []
-    generic_embeddings = bert_model.encode(list(generic_words))
-    
-    for word in keywords:
-        word_embedding = bert_model.encode([word])[0]
+    keywords = list(keywords)
+    generic_embeddings = encode_texts(generic_words)
+    keyword_embeddings = encode_texts(keywords)
+
+    for word, word_embedding in zip(keywords, keyword_embeddings):
         similarities = cosine_similarity([word_embedding], generic_embeddings)[0]
         if max(similarities) < threshold:
             filtered_keywords.append(word)
@@ -1,7 +1,9 @@
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from sentence_transformers import SentenceTransformer
+import numpy as np
 import os
+from .batching import BatchScheduler
 
 # Add this to prevent tokenizer parallelism warnings
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
@@ -10,20 +12,55 @@ os.environ["TOKENIZERS_PARALLELISM"] = "false"
 bert_model = SentenceTransformer('all-MiniLM-L6-v2', device='cpu')  # or 'cuda' if you have GPU
 bert_model.max_seq_length = 512  # Set explicit sequence length
 
+def _encode_batch(texts):
+    return list(bert_model.encode(texts, show_progress_bar=False))
+
+# Every encode goes through one scheduler so small calls from concurrent
+# requests (single keywords, a pair of documents) run as a single batch
+encode_scheduler = BatchScheduler(_encode_batch, max_batch_size=64, max_wait_ms=5, name="bert")
+
+def encode_texts(texts):
+    """
+    Encodes texts through the shared scheduler; returns a 2-D numpy array
+    with one embedding per text, as bert_model.encode would.
+    """
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, bert_model.get_sentence_embedding_dimension()), dtype=np.float32)
+    return np.vstack(encode_scheduler.run(texts))
+
 def tfidf_similarity(text1, text2):
     vectorizer = TfidfVectorizer()
     vectors = vectorizer.fit_transform([text1, text2])
     return cosine_similarity(vectors[0], vectors[1])[0][0]
 
-def bert_similarity(text1, text2):
-    try:
-        embeddings = bert_model.encode(
-            [text1, text2],
-            convert_to_tensor=True,
-            show_progress_bar=False
-        )
-        return cosine_similarity(embeddings[0].cpu().numpy().reshape(1, -1), 
-                               embeddings[1].cpu().numpy().reshape(1, -1))[0][0]
-    except Exception as e:
-        print(f"BERT Error: {str(e)}")
-        return 0.0
\ No newline at end of file
+# Supported pooling modes for pool_similarity_matrix
+SIMILARITY_POOLINGS = ("max", "mean", "topk")
+
+def pool_similarity_matrix(matrix, pooling="max", top_k=3):
+    """
+    Reduces a (reference chunks x candidate chunks) similarity matrix to one score.
+      - "max":  best candidate chunk for each reference chunk, averaged
+      - "mean": average over every chunk pair
+      - "topk": mean of the top_k candidate chunks for each reference chunk, averaged
+    """
+    if pooling == "max":
+        return matrix.max(axis=1).mean()
+    if pooling == "mean":
+        return matrix.mean()
+    if pooling == "topk":
+        k = max(1, min(top_k, matrix.shape[1]))
+        return np.sort(matrix, axis=1)[:, -k:].mean()
+    raise ValueError(f"Unknown similarity pooling: {pooling}")
+
+def chunked_similarity(reference_chunks, candidate_chunks, pooling="max", top_k=3):
+    """
+    Scores two documents chunk-by-chunk. Both sides are encoded together in
+    batches, so cost grows linearly with the number of chunks.
+    """
+    if not reference_chunks or not candidate_chunks:
+        return 0.0
+    embeddings = encode_texts(list(reference_chunks) + list(candidate_chunks))
+    split = len(reference_chunks)
+    matrix = cosine_similarity(embeddings[:split], embeddings[split:])
+    return pool_similarity_matrix(matrix, pooling, top_k)
@@ -0,0 +1,100 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Child processes allowed to parse PDFs at the same time
+MAX_PARSE_WORKERS = int(os.environ.get("MAX_PARSE_WORKERS", 2))
+# Per-document limits; a child that exceeds either is killed
+PARSE_TIMEOUT_S = float(os.environ.get("PARSE_TIMEOUT_S", 20))
+PARSE_MAX_RSS_MB = int(os.environ.get("PARSE_MAX_RSS_MB", 512))
+# Longest wait for a free parser when the caller has no deadline of its own
+PARSE_QUEUE_TIMEOUT_S = float(os.environ.get("PARSE_QUEUE_TIMEOUT_S", 30))
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+_slots = threading.BoundedSemaphore(MAX_PARSE_WORKERS)
+
+
+class PdfParseError(Exception):
+    """
+    Raised when a sandboxed PDF parse fails, times out or runs out of memory.
+    """
+
+
+class PdfParserBusy(PdfParseError):
+    """
+    Raised when no parser slot frees up within the caller's wait limit.
+    """
+
+
+def _rss_mb(pid):
+    """
+    Resident memory of a process in MB, or None where /proc is unavailable.
+    """
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def parse_pdf(pdf_path, timeout=PARSE_TIMEOUT_S, max_rss_mb=PARSE_MAX_RSS_MB,
+              queue_timeout=PARSE_QUEUE_TIMEOUT_S):
+    """
+    Runs extract_text and analyze_pdf_formatting for one PDF in a separate
+    `python -m utils.pdf_worker` process, so a huge or pathological upload
+    costs that child rather than the web worker. At most MAX_PARSE_WORKERS
+    children run at once; waiting for one is capped at queue_timeout seconds.
+
+    Returns {"text": ..., "formatting": ...}. Raises PdfParserBusy if no slot
+    frees up in time, and PdfParseError if the child fails, runs past
+    timeout seconds or grows beyond max_rss_mb.
+    """
+    if not _slots.acquire(timeout=max(0.0, queue_timeout)):
+        raise PdfParserBusy("All PDF parsers are busy")
+    try:
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "utils.pdf_worker", str(Path(pdf_path).resolve()), str(max_rss_mb)],
+            cwd=_PROJECT_ROOT,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+
+        deadline = time.monotonic() + timeout
+        error = None
+        while True:
+            try:
+                stdout, stderr = proc.communicate(timeout=0.05)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            if time.monotonic() > deadline:
+                error = f"PDF parsing timed out after {timeout:g}s"
+                break
+            rss = _rss_mb(proc.pid)
+            if rss is not None and rss > max_rss_mb:
+                error = f"PDF parsing exceeded the {max_rss_mb} MB memory limit"
+                break
+
+        if error:
+            proc.kill()
+            proc.communicate()
+    finally:
+        _slots.release()
+
+    if error:
+        raise PdfParseError(error)
+    if proc.returncode != 0 or not stdout:
+        detail = stderr.decode("utf-8", "replace").strip().splitlines()
+        raise PdfParseError(
+            f"PDF parser exited unexpectedly (code {proc.returncode})"
+            + (f": {detail[-1]}" if detail else "")
+        )
+    result = json.loads(stdout)
+    if "error" in result:
+        raise PdfParseError(result["error"])
+    return result
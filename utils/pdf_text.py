@@ -0,0 +1,45 @@
+import pdfplumber
+from pathlib import Path
+
+# Month keywords to ignore date lines
+MONTH_KEYWORDS = {
+    "jan", "january", "feb", "february", "mar", "march", "apr", "april",
+    "may", "jun", "june", "jul", "july", "aug", "august",
+    "sep", "sept", "september", "oct", "october", "nov", "november", "dec", "december"
+}
+
+def contains_date_word(line):
+    return any(month in line.lower() for month in MONTH_KEYWORDS)
+
+def is_bullet_point(line):
+    return line.strip().startswith(("•", "-", "*"))
+
+def extract_text(file_path, max_pages=None):
+    """
+    Extracts bullet-grouped text from a PDF, skipping date lines. Only the
+    first max_pages pages are read when max_pages is set.
+    """
+    path = Path(file_path)
+    suffix = path.suffix.lower()
+    bullet_lines = []
+
+    if suffix == '.pdf':
+        with pdfplumber.open(str(path)) as pdf:
+            current_bullet = ""
+            pages = pdf.pages if max_pages is None else pdf.pages[:max_pages]
+            for page in pages:
+                lines = (page.extract_text() or "").splitlines()
+                page.close()  # drop pdfplumber's per-page object cache
+                for line in lines:
+                    clean = line.strip()
+                    if not clean or contains_date_word(clean):
+                        continue
+                    if is_bullet_point(clean):
+                        if current_bullet:
+                            bullet_lines.append(current_bullet.strip())
+                        current_bullet = clean  # start new bullet
+                    else:
+                        current_bullet += " " + clean  # continuation
+            if current_bullet:
+                bullet_lines.append(current_bullet.strip())
+        return "\n".join(bullet_lines).strip()
@@ -0,0 +1,58 @@
+"""
+Child-process entry point used by utils.pdf_sandbox:
+
+    python -m utils.pdf_worker <pdf_path> <max_rss_mb>
+
+Caps its own memory, parses the PDF and writes one JSON object to stdout.
+It runs in a fresh interpreter and imports only the PDF modules, never
+app.py or the models.
+"""
+import json
+import sys
+
+# Formatting checks sample long documents down to this many pages and skip
+# char-level checks on pages with more characters than this
+FORMATTING_MAX_PAGES = 10
+FORMATTING_MAX_CHARS_PER_PAGE = 20000
+# Text extraction only reads the first pages of very long documents
+TEXT_MAX_PAGES = 20
+
+def _limit_memory(max_rss_mb):
+    # Address-space cap as a backstop for the parent's RSS polling; it is
+    # looser because virtual size is always larger than RSS
+    try:
+        import resource
+    except ImportError:  # Windows
+        return
+    limit = max_rss_mb * 2 * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def main(argv):
+    pdf_path, max_rss_mb = argv[1], int(argv[2])
+    _limit_memory(max_rss_mb)
+
+    # Imported after the limit is in place
+    from .pdf_text import extract_text
+    from .formatting import analyze_pdf_formatting
+
+    try:
+        formatting = analyze_pdf_formatting(
+            pdf_path,
+            max_pages=FORMATTING_MAX_PAGES,
+            max_chars_per_page=FORMATTING_MAX_CHARS_PER_PAGE
+        )
+        formatting["text_pages_read"] = min(formatting["pages_total"], TEXT_MAX_PAGES)
+        result = {
+            "text": extract_text(pdf_path, max_pages=TEXT_MAX_PAGES),
+            "formatting": formatting
+        }
+    except MemoryError:
+        result = {"error": f"PDF parsing exceeded the {max_rss_mb} MB memory limit"}
+    except Exception as e:
+        result = {"error": f"PDF parsing failed: {e}"}
+
+    sys.stdout.write(json.dumps(result, separators=(",", ":")))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,152 @@
+import re
+import time
+from pathlib import Path
+
+from .text_processing import (
+    preprocess_text, rank_resume, group_bullet_lines, build_chunks,
+    SIMILARITY_POOLING, SIMILARITY_TOP_K
+)
+from .pdf_sandbox import parse_pdf, PdfParseError, PARSE_QUEUE_TIMEOUT_S
+from .enhanced_grammar_and_paraphrasing import check_grammar_and_strength
+from .admission import tier_options
+
+SUPPORTED_SUFFIXES = (".pdf",)
+
+ACCOMPLISHMENT_KEYWORDS = r"\b(developed|implemented|created|improved|achieved|designed|optimized)\b"
+RESULT_KEYWORDS = r"\b(\d+%|\d+\s*(?:points|percent)|increased|decreased|improved|resulted|reduced)\b"
+
+def is_experience_bullet(text):
+    text_lower = text.lower()
+    return (re.search(ACCOMPLISHMENT_KEYWORDS, text_lower)
+            and re.search(RESULT_KEYWORDS, text_lower)
+            and len(text.split()) >= 5)
+
+def bullet_weakness(text):
+    """
+    Sort key, higher is weaker: missing accomplishment/result keyword groups
+    first, then shorter bullets.
+    """
+    text_lower = text.lower()
+    missing = (not re.search(ACCOMPLISHMENT_KEYWORDS, text_lower)) + (not re.search(RESULT_KEYWORDS, text_lower))
+    return (missing, -len(text.split()))
+
+def weakest_bullets(bullet_lines, limit):
+    """
+    The limit weakest bullets that fail is_experience_bullet. Lines too short
+    for check_grammar_and_strength to analyze are left out.
+    """
+    weak = [
+        line for line in bullet_lines
+        if len(line.split()) >= 5 and not is_experience_bullet(line)
+    ]
+    return sorted(weak, key=bullet_weakness, reverse=True)[:limit]
+
+def format_formatting_results(formatting_data):
+    messages = []
+
+    if formatting_data.get("unique_font_names", 0) > 3:
+        messages.append(
+            f"Too many different fonts ({formatting_data['unique_font_names']}) - use 2-3 maximum."
+        )
+    if formatting_data.get("bullet_percentage", 0) < 30:
+        messages.append(
+            f"Low bullet usage ({formatting_data['bullet_percentage']}%) - Increase to ~40% or more for clarity."
+        )
+
+    bullet_consistency_msg = formatting_data.get("bullet_font_consistency")
+    if bullet_consistency_msg:
+        messages.append(f"[Bullet Font Check] {bullet_consistency_msg}")
+
+    pages_total = formatting_data.get("pages_total", 0)
+    pages_analyzed = formatting_data.get("pages_analyzed", pages_total)
+    if pages_analyzed < pages_total:
+        messages.append(
+            f"Long document ({pages_total} pages) - formatting was checked on {pages_analyzed} sampled pages."
+        )
+    text_pages_read = formatting_data.get("text_pages_read", pages_total)
+    if text_pages_read < pages_total:
+        messages.append(
+            f"Only the first {text_pages_read} of {pages_total} pages were read for keyword and grammar analysis."
+        )
+
+    return messages
+
+def analyze_resume_file(resume_path, job_desc, pooling=SIMILARITY_POOLING,
+                        top_k=SIMILARITY_TOP_K, choose_tier=None, weak_limit=3,
+                        deadline=None, debug_path=None, line_cache=None):
+    """
+    Full resume analysis, shared by the /analyze_resume route and the bulk CLI:
+    1) Extract bullet lines from the PDF
+    2) Group them so we can do grammar checks
+    3) Analyze for ATS rank, formatting, grammar, etc.
+
+    choose_tier, if given, is called right before paraphrasing and returns
+    one of admission.DEGRADE_TIERS; otherwise the "full" tier is used.
+    line_cache (fingerprint -> line_analysis entry) lets unchanged bullets
+    from a previous analysis skip grammar and paraphrase.
+    Returns the response dict (without 'Content Organization').
+    """
+    # Step 1: Extract bullet-based text (and formatting data). The PDF is
+    # parsed in a sandboxed child process with time and memory limits; nothing
+    # is ever parsed in this process.
+    if Path(resume_path).suffix.lower() not in SUPPORTED_SUFFIXES:
+        raise PdfParseError("Only PDF resumes are supported")
+    # Waiting for a free parser counts against the request's budget
+    queue_timeout = PARSE_QUEUE_TIMEOUT_S if deadline is None else deadline - time.monotonic()
+    parsed = parse_pdf(resume_path, queue_timeout=queue_timeout)
+    raw_text, formatting_data = parsed["text"], parsed["formatting"]
+
+    # Step 2: Group bullet lines into paragraphs for grammar context
+    grouped_lines = group_bullet_lines(raw_text)
+
+    grouped_text = "\n\n".join(grouped_lines)
+    preprocessed_text = preprocess_text(grouped_text)
+
+    # Export debug
+    if debug_path is not None:
+        with open(debug_path, "w", encoding="utf-8") as f:
+            f.write(grouped_text)
+        print(f"[DEBUG] Grouped text written to {debug_path}")
+
+    # Step 3: Analyze
+    keyword_results = rank_resume(
+        preprocessed_text,
+        preprocess_text(job_desc),
+        resume_chunks=build_chunks(grouped_lines),
+        job_chunks=build_chunks(group_bullet_lines(job_desc)),
+        pooling=pooling,
+        top_k=top_k
+    )
+
+    # Step 4: Grammar & bullet-based paraphrasing
+    bullet_lines = []
+    for para in grouped_lines:
+        if para and para[0] in ("•", "-", "*"):
+            bullet_text = para[1:].lstrip()
+            bullet_lines.append(bullet_text)
+
+    # Degrade paraphrasing under load or when the budget is running out
+    tier = choose_tier() if choose_tier is not None else "full"
+    weak_lines = weakest_bullets(bullet_lines, weak_limit) if tier == "weakest_only" else ()
+    options = tier_options(tier, weak_lines=weak_lines)
+
+    bullet_analysis = {}
+    try:
+        bullet_analysis = check_grammar_and_strength(
+            "\n".join(bullet_lines), deadline=deadline, line_cache=line_cache, **options
+        )
+    except Exception as e:
+        print(f"Error in grammar and strength analysis: {e}")
+        bullet_analysis = {"style_issues": [], "line_analysis": [], "metrics": {}}
+    bullet_analysis.setdefault("metrics", {})["degrade_tier"] = tier
+
+    # Step 5: Build final result (no grouping_issues)
+    return {
+        "score": keyword_results.get("score", 0),
+        "missing_keywords": keyword_results.get("missing_keywords", []),
+        "formatting_feedback": format_formatting_results(formatting_data),
+        "feedback": keyword_results.get("feedback", "No feedback available"),
+        "style_issues": bullet_analysis.get("style_issues", []),
+        "line_analysis": bullet_analysis.get("line_analysis", []),
+        "metrics": bullet_analysis.get("metrics", {})
+    }
@@ -1,50 +1,53 @@
-import pdfplumber
 import docx2txt
 import spacy
 import re
-from pathlib import Path
 from sklearn.metrics.pairwise import cosine_similarity
-from .models import bert_model
+from .models import encode_texts, chunked_similarity
 from .keywords import analyze_keywords
+# PDF text extraction lives in pdf_text so sandboxed parsers don't load the models
+from .pdf_text import MONTH_KEYWORDS, contains_date_word, is_bullet_point, extract_text
 
 nlp = spacy.load("en_core_web_sm")
 
-# Month keywords to ignore date lines
-MONTH_KEYWORDS = {
-    "jan", "january", "feb", "february", "mar", "march", "apr", "april",
-    "may", "jun", "june", "jul", "july", "aug", "august",
-    "sep", "sept", "september", "oct", "october", "nov", "november", "dec", "december"
-}
-
-def contains_date_word(line):
-    return any(month in line.lower() for month in MONTH_KEYWORDS)
-
-def is_bullet_point(line):
-    return line.strip().startswith(("•", "-", "*"))
-
-def extract_text(file_path):
-    path = Path(file_path)
-    suffix = path.suffix.lower()
-    bullet_lines = []
-
-    if suffix == '.pdf':
-        with pdfplumber.open(str(path)) as pdf:
-            current_bullet = ""
-            for page in pdf.pages:
-                lines = page.extract_text().splitlines()
-                for line in lines:
-                    clean = line.strip()
-                    if not clean or contains_date_word(clean):
-                        continue
-                    if is_bullet_point(clean):
-                        if current_bullet:
-                            bullet_lines.append(current_bullet.strip())
-                        current_bullet = clean  # start new bullet
-                    else:
-                        current_bullet += " " + clean  # continuation
-            if current_bullet:
-                bullet_lines.append(current_bullet.strip())
-        return "\n".join(bullet_lines).strip()
+# Chunked similarity settings. MiniLM truncates long input, so documents are
+# scored as windows of at most CHUNK_MAX_WORDS (preprocessed) words each.
+CHUNK_MAX_WORDS = 128
+SIMILARITY_POOLING = "max"
+SIMILARITY_TOP_K = 3
+
+def group_bullet_lines(raw_text):
+    """
+    Groups lines into paragraphs: a blank line ends the current paragraph,
+    a bullet symbol starts a new one, anything else is a continuation.
+    """
+    grouped_lines = []
+    current_para = []
+
+    for line in raw_text.splitlines():
+        stripped = line.strip()
+
+        # If blank line -> end current paragraph
+        if not stripped:
+            if current_para:
+                grouped_lines.append(" ".join(current_para))
+                current_para = []
+            continue
+
+        # If line starts with a bullet symbol
+        if stripped.startswith(("•", "-", "*")):
+            # close existing paragraph if any
+            if current_para:
+                grouped_lines.append(" ".join(current_para))
+                current_para = []
+            # start a new bullet paragraph
+            current_para.append(stripped)
+        else:
+            current_para.append(stripped)
+
+    if current_para:
+        grouped_lines.append(" ".join(current_para))
+
+    return grouped_lines
 
 def preprocess_text(text):
     """
@@ -53,17 +56,34 @@ def preprocess_text(text):
     doc = nlp(text.lower())
     return " ".join([token.lemma_ for token in doc if not token.is_stop and token.is_alpha])
 
+def build_chunks(paragraphs, max_words=CHUNK_MAX_WORDS):
+    """
+    Preprocesses each paragraph (as grouped by group_bullet_lines) and splits
+    long ones into windows of max_words, so every chunk fits the model.
+    """
+    chunks = []
+    for doc in nlp.pipe(para.lower() for para in paragraphs):
+        words = [token.lemma_ for token in doc if not token.is_stop and token.is_alpha]
+        for start in range(0, len(words), max_words):
+            chunks.append(" ".join(words[start:start + max_words]))
+    return chunks
+
 def get_similarity(resume, job_desc):
     """
     Computes similarity score using BERT embeddings.
     """
-    embeddings = bert_model.encode([resume, job_desc])
+    embeddings = encode_texts([resume, job_desc])
     return cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
 
 
-def rank_resume(resume_text, job_text):
-    # 1) Compute BERT similarity
-    bert_sim = float(get_similarity(resume_text, job_text))  # cast to builtin float
+def rank_resume(resume_text, job_text, resume_chunks=None, job_chunks=None,
+                pooling=SIMILARITY_POOLING, top_k=SIMILARITY_TOP_K):
+    # 1) Compute BERT similarity (chunk-to-chunk when chunks are given,
+    #    so the whole document is covered instead of the first ~512 tokens)
+    if resume_chunks and job_chunks:
+        bert_sim = float(chunked_similarity(job_chunks, resume_chunks, pooling, top_k))
+    else:
+        bert_sim = float(get_similarity(resume_text, job_text))  # cast to builtin float
 
     # 2) Keyword coverage
     missing_keywords = analyze_keywords(resume_text, job_text)